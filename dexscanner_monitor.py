@@ -1,681 +1,1030 @@
-import requests
-import time
-import sqlite3
-import logging
-import json
-import os
-from datetime import datetime, timedelta
-import threading
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
-
-# Configuration
-TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
-TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
-CHECK_INTERVAL = 15  # seconds
-PERFORMANCE_INTERVALS = [1, 6, 24]  # hours
-DB_PATH = "dexscanner_monitor.db"
-LOG_FILE = "dexscanner_monitor.log"
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler(LOG_FILE),
-        logging.StreamHandler()
-    ]
-)
-logger = logging.getLogger("DexscannerMonitor")
-
-class Database:
-    def __init__(self, db_path):
-        self.db_path = db_path
-        self._initialize_db()
-    
-    def _initialize_db(self):
-        """Initialize database with required tables"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Table for tracked tokens
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS tokens (
-            id TEXT PRIMARY KEY,
-            pair_name TEXT,
-            deployer TEXT,
-            owner_renounced INTEGER,
-            launch_time TIMESTAMP,
-            mint_enabled INTEGER,
-            liq_burned REAL,
-            chain TEXT,
-            initial_mc REAL,
-            initial_liq REAL,
-            website TEXT,
-            source TEXT,
-            detected_at TIMESTAMP,
-            is_safe INTEGER DEFAULT 0
-        )
-        ''')
-        
-        # Table for token price performance
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS token_performance (
-            id TEXT,
-            timestamp TIMESTAMP,
-            price REAL,
-            market_cap REAL,
-            volume_24h REAL,
-            holders INTEGER,
-            PRIMARY KEY (id, timestamp),
-            FOREIGN KEY (id) REFERENCES tokens(id)
-        )
-        ''')
-        
-        # Table for security checks
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS security_checks (
-            id TEXT PRIMARY KEY,
-            has_honey_pot INTEGER,
-            has_mint_function INTEGER,
-            has_proxy INTEGER,
-            has_suspicious_holders INTEGER,
-            check_time TIMESTAMP,
-            FOREIGN KEY (id) REFERENCES tokens(id)
-        )
-        ''')
-        
-        conn.commit()
-        conn.close()
-        logger.info("Database initialized successfully")
-    
-    def token_exists(self, token_id):
-        """Check if token already exists in database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT id FROM tokens WHERE id = ?", (token_id,))
-        result = cursor.fetchone()
-        conn.close()
-        return result is not None
-    
-    def add_token(self, token_data):
-        """Add new token to database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-        INSERT INTO tokens (
-            id, pair_name, deployer, owner_renounced, launch_time, 
-            mint_enabled, liq_burned, chain, initial_mc, initial_liq, 
-            website, source, detected_at, is_safe
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            token_data["id"],
-            token_data["pair_name"],
-            token_data["deployer"],
-            1 if token_data["owner_renounced"] else 0,
-            token_data["launch_time"],
-            0 if token_data["mint_enabled"] == "No ✅" else 1,
-            token_data["liq_burned"],
-            token_data["chain"],
-            token_data["initial_mc"],
-            token_data["initial_liq"],
-            token_data["website"],
-            token_data["source"],
-            datetime.now().isoformat(),
-            0
-        ))
-        
-        conn.commit()
-        conn.close()
-        logger.info(f"Added new token to database: {token_data['pair_name']}")
-    
-    def update_token_performance(self, token_id, performance_data):
-        """Update token performance metrics"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-        INSERT INTO token_performance (
-            id, timestamp, price, market_cap, volume_24h, holders
-        ) VALUES (?, ?, ?, ?, ?, ?)
-        ''', (
-            token_id,
-            datetime.now().isoformat(),
-            performance_data["price"],
-            performance_data["market_cap"],
-            performance_data["volume_24h"],
-            performance_data["holders"]
-        ))
-        
-        conn.commit()
-        conn.close()
-        logger.info(f"Updated performance data for token: {token_id}")
-    
-    def update_security_check(self, token_id, security_data):
-        """Update security check results"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-        INSERT OR REPLACE INTO security_checks (
-            id, has_honey_pot, has_mint_function, has_proxy, 
-            has_suspicious_holders, check_time
-        ) VALUES (?, ?, ?, ?, ?, ?)
-        ''', (
-            token_id,
-            security_data["has_honey_pot"],
-            security_data["has_mint_function"],
-            security_data["has_proxy"],
-            security_data["has_suspicious_holders"],
-            datetime.now().isoformat()
-        ))
-        
-        # Update token safety status
-        is_safe = not any([
-            security_data["has_honey_pot"],
-            security_data["has_mint_function"],
-            security_data["has_proxy"],
-            security_data["has_suspicious_holders"]
-        ])
-        
-        cursor.execute('''
-        UPDATE tokens SET is_safe = ? WHERE id = ?
-        ''', (1 if is_safe else 0, token_id))
-        
-        conn.commit()
-        conn.close()
-        logger.info(f"Updated security checks for token: {token_id}")
-    
-    def get_token_performance_history(self, token_id, hours=24):
-        """Get token performance history for specified hours"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        time_threshold = (datetime.now() - timedelta(hours=hours)).isoformat()
-        
-        cursor.execute('''
-        SELECT timestamp, price, market_cap, volume_24h, holders
-        FROM token_performance
-        WHERE id = ? AND timestamp >= ?
-        ORDER BY timestamp ASC
-        ''', (token_id, time_threshold))
-        
-        results = cursor.fetchall()
-        conn.close()
-        
-        if not results:
-            return None
-        
-        performance_data = []
-        for row in results:
-            performance_data.append({
-                "timestamp": row[0],
-                "price": row[1],
-                "market_cap": row[2],
-                "volume_24h": row[3],
-                "holders": row[4]
-            })
-        
-        return performance_data
-    
-    def get_tokens_for_performance_check(self):
-        """Get tokens that need performance monitoring"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Get tokens detected in the past week
-        time_threshold = (datetime.now() - timedelta(days=7)).isoformat()
-        
-        cursor.execute('''
-        SELECT id, pair_name, detected_at
-        FROM tokens
-        WHERE detected_at >= ?
-        ''', (time_threshold,))
-        
-        results = cursor.fetchall()
-        conn.close()
-        
-        tokens = []
-        for row in results:
-            tokens.append({
-                "id": row[0],
-                "pair_name": row[1],
-                "detected_at": row[2]
-            })
-        
-        return tokens
-
-
-class DexscannerAPI:
-    def __init__(self):
-        self.base_url = "https://api.dexscanner.io"
-        self.headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-            "Accept": "application/json"
-        }
-    
-    def get_new_listings(self, chain="sol", max_retries=5, timeout=20):
-        """Get new listings from Dexscanner API with retry logic"""
-        retries = 0
-        while retries < max_retries:
-            try:
-                url = f"{self.base_url}/v1/{chain}/dex/pairs/new"
-                logger.info(f"Fetching new listings from {url}")
-                response = requests.get(url, headers=self.headers, timeout=timeout)
-                response.raise_for_status()
-                return response.json()
-            except requests.Timeout as e:
-                retries += 1
-                wait_time = 3 + retries * 3  # Exponential backoff
-                logger.warning(f"Timeout fetching new listings (attempt {retries}/{max_retries}). Retrying in {wait_time} seconds: {e}")
-                time.sleep(wait_time)
-            except requests.RequestException as e:
-                logger.error(f"Error fetching new listings: {e}")
-                return None
-        
-        logger.error(f"Failed to fetch new listings after {max_retries} attempts")
-        return None
-    
-    def get_token_details(self, token_id, chain="sol", max_retries=3, timeout=10):
-        """Get detailed information about a token with retry logic"""
-        retries = 0
-        while retries < max_retries:
-            try:
-                url = f"{self.base_url}/v1/{chain}/dex/pairs/{token_id}"
-                response = requests.get(url, headers=self.headers, timeout=timeout)
-                response.raise_for_status()
-                return response.json()
-            except requests.Timeout as e:
-                retries += 1
-                wait_time = 2 ** retries  # Exponential backoff
-                logger.warning(f"Timeout fetching token details for {token_id} (attempt {retries}/{max_retries}). Retrying in {wait_time} seconds: {e}")
-                time.sleep(wait_time)
-            except requests.RequestException as e:
-                logger.error(f"Error fetching token details for {token_id}: {e}")
-                return None
-        
-        logger.error(f"Failed to fetch token details for {token_id} after {max_retries} attempts")
-        return None
-
-class SecurityValidator:
-    @staticmethod
-    def validate_token(token_details):
-        """Validate token for potential security issues"""
-        security_data = {
-            "has_honey_pot": False,
-            "has_mint_function": False,
-            "has_proxy": False,
-            "has_suspicious_holders": False
-        }
-        
-        # Check for mint function (basic check based on details)
-        if "mint" in str(token_details).lower() and "enabled" in str(token_details).lower():
-            security_data["has_mint_function"] = True
-        
-        # Check for suspicious holder concentration (if top 10 holders have more than 80%)
-        if "holders" in token_details and "top10" in token_details["holders"]:
-            top10_percentage = float(token_details["holders"]["top10"].replace("%", ""))
-            if top10_percentage > 80:
-                security_data["has_suspicious_holders"] = True
-        
-        # Additional security checks can be implemented here
-        # These would typically require contract analysis which might need integration
-        # with specialized APIs or services
-        
-        return security_data
-
-
-class TelegramNotifier:
-    def __init__(self, token, chat_id):
-        self.token = token
-        self.chat_id = chat_id
-        self.base_url = f"https://api.telegram.org/bot{token}"
-    
-    def send_message(self, message, parse_mode="Markdown"):
-        """Send message to Telegram chat"""
-        try:
-            url = f"{self.base_url}/sendMessage"
-            payload = {
-                "chat_id": self.chat_id,
-                "text": message,
-                "parse_mode": parse_mode
-            }
-            response = requests.post(url, json=payload)
-            response.raise_for_status()
-            return True
-        except requests.RequestException as e:
-            logger.error(f"Error sending Telegram message: {e}")
-            return False
-    
-    def format_token_message(self, token_data):
-        """Format token data into readable message for Telegram"""
-        message = (
-            f"📌 Pair: {token_data['pair_name']}\n"
-            f"👨‍💻 Deployer: {token_data['deployer']}\n"
-            f"👤 Owner: {'RENOUNCED' if token_data['owner_renounced'] else 'NOT RENOUNCED'}\n"
-            f"🔸 Chain: {token_data['chain']} | ⚖️ Age: {token_data['age']}\n"
-            f"🌿 Mint: {token_data['mint_enabled']} | Liq: 🔥 ({token_data['liq_burned']}%)\n"
-            f"💰 MC: ${token_data['market_cap']} | Liq: ${token_data['liquidity']} ({token_data['liq_percentage']}%)\n"
-            f"📈 24h: {token_data['price_change_24h']}% | V: ${token_data['volume_24h']} | B:{token_data['buys']} S:{token_data['sells']}\n"
-            f"💲 Price: ${token_data['price']}\n"
-            f"💵 Launch MC: ${token_data['launch_mc']} ({token_data['launch_mc_multiplier']}x)\n"
-            f"👆 ATH: ${token_data['ath']} ({token_data['ath_multiplier']}x)\n"
-            f"🔗 Website ({token_data['source_link']})\n"
-            f"📊 TS: {token_data['transaction_count']}\n"
-            f"👩‍👧‍👦 Holders: {token_data['holders_count']} | Top10: {token_data['top10_percentage']}%\n"
-            f"💸 Airdrops: {token_data['airdrops']} for a total of {token_data['airdrops_percentage']}%\n"
-            f"🥡 Block 0 Snipes: {token_data['block0_snipes_percentage']}% | {token_data['block0_snipes_amount']} SOL\n"
-            f"👶🏽 Fresh Wallets: {token_data['fresh_wallets']} | {token_data['fresh_wallets_percentage']}% Time\n"
-            f"💵 TEAM WALLETS {token_data['team_wallets_percentage']}% | {token_data['team_wallets_amount']} SOL\n"
-            f"Deployer {token_data['deployer_amount']} SOL | {token_data['deployer_percentage']}% Time"
-        )
-        
-        # Add security warnings if applicable
-        if hasattr(token_data, 'security_warnings') and token_data['security_warnings']:
-            message += "\n\n⚠️ SECURITY WARNINGS ⚠️\n"
-            for warning in token_data['security_warnings']:
-                message += f"- {warning}\n"
-        
-        return message
-    
-    def format_performance_update(self, token_data, performance_data):
-        """Format performance update for a token"""
-        # Calculate price changes
-        first_price = performance_data[0]["price"] if performance_data else 0
-        current_price = performance_data[-1]["price"] if performance_data else 0
-        price_change = ((current_price - first_price) / first_price * 100) if first_price > 0 else 0
-        
-        message = (
-            f"📊 PERFORMANCE UPDATE 📊\n"
-            f"📌 Pair: {token_data['pair_name']}\n"
-            f"💲 Current Price: ${current_price:.8f}\n"
-            f"📈 Price Change: {price_change:.2f}%\n"
-            f"💰 Current MC: ${performance_data[-1]['market_cap']}\n"
-            f"👥 Holders: {performance_data[-1]['holders']}\n"
-            f"🔄 24h Volume: ${performance_data[-1]['volume_24h']}\n"
-            f"⏰ Monitored since: {token_data['detected_at']}\n"
-        )
-        
-        return message
-
-
-class DexscannerMonitor:
-    def __init__(self):
-        self.db = Database(DB_PATH)
-        self.api = DexscannerAPI()
-        self.validator = SecurityValidator()
-        self.notifier = TelegramNotifier(TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID)
-        self.last_check_time = datetime.now()
-        self.processed_tokens = set()
-    
-    def parse_token_details(self, token_raw, details_raw=None):
-        """Parse token details from API response"""
-        if not details_raw:
-            details_raw = {}
-        
-        # Check if this is from pump.fun or pump.swap
-        source = None
-        if "name" in token_raw:
-            name_lower = token_raw["name"].lower()
-            if "pump.fun" in name_lower:
-                source = "pump.fun"
-            elif "pump.swap" in name_lower:
-                source = "pump.swap"
-        
-        # If not from our target sources, return None
-        if not source:
-            return None
-        
-        # Basic details
-        token_data = {
-            "id": token_raw.get("id", ""),
-            "pair_name": token_raw.get("name", "Unknown"),
-            "deployer": details_raw.get("deployer", "Unknown"),
-            "owner_renounced": details_raw.get("ownerRenounced", False),
-            "chain": "SOL",
-            "age": self._format_age(token_raw.get("createdAt")),
-            "launch_time": token_raw.get("createdAt"),
-            "mint_enabled": "No ✅" if not details_raw.get("mintEnabled", True) else "Yes ⚠️",
-            "liq_burned": details_raw.get("liquidityBurned", 0),
-            "market_cap": self._format_number(token_raw.get("marketCap", 0)),
-            "liquidity": self._format_number(token_raw.get("liquidity", 0)),
-            "liq_percentage": self._calculate_percentage(token_raw.get("liquidity", 0), token_raw.get("marketCap", 0)),
-            "price": self._format_number(token_raw.get("price", 0), 8),
-            "price_change_24h": token_raw.get("priceChange24h", 0),
-            "volume_24h": self._format_number(token_raw.get("volume24h", 0)),
-            "buys": details_raw.get("buys24h", 0),
-            "sells": details_raw.get("sells24h", 0),
-            "launch_mc": self._format_number(details_raw.get("launchMarketCap", 0)),
-            "launch_mc_multiplier": self._calculate_multiplier(token_raw.get("marketCap", 0), details_raw.get("launchMarketCap", 0)),
-            "ath": self._format_number(details_raw.get("athMarketCap", 0)),
-            "ath_multiplier": self._calculate_multiplier(details_raw.get("athMarketCap", 0), token_raw.get("marketCap", 0)),
-            "source": source,
-            "source_link": f"https://{source}",
-            "transaction_count": details_raw.get("transactionCount", 0),
-            "holders_count": details_raw.get("holdersCount", 0),
-            "top10_percentage": details_raw.get("top10HoldersPercentage", 0),
-            "airdrops": details_raw.get("airdropsCount", 0),
-            "airdrops_percentage": details_raw.get("airdropsPercentage", 0),
-            "block0_snipes_percentage": details_raw.get("block0SnipesPercentage", 0),
-            "block0_snipes_amount": details_raw.get("block0SnipesAmount", 0),
-            "fresh_wallets": details_raw.get("freshWalletsCount", 0),
-            "fresh_wallets_percentage": details_raw.get("freshWalletsPercentage", 0),
-            "team_wallets_percentage": details_raw.get("teamWalletsPercentage", 0),
-            "team_wallets_amount": details_raw.get("teamWalletsAmount", 0),
-            "deployer_amount": details_raw.get("deployerAmount", 0),
-            "deployer_percentage": details_raw.get("deployerPercentage", 0),
-            "website": details_raw.get("website", f"https://{source}"),
-            "initial_mc": token_raw.get("marketCap", 0),
-            "initial_liq": token_raw.get("liquidity", 0)
-        }
-        
-        # Extract performance data for DB
-        performance_data = {
-            "price": token_raw.get("price", 0),
-            "market_cap": token_raw.get("marketCap", 0),
-            "volume_24h": token_raw.get("volume24h", 0),
-            "holders": details_raw.get("holdersCount", 0)
-        }
-        
-        # Run security validation
-        security_data = self.validator.validate_token(details_raw)
-        
-        # Add security warnings if any
-        if any(security_data.values()):
-            token_data["security_warnings"] = []
-            if security_data["has_honey_pot"]:
-                token_data["security_warnings"].append("Potential honeypot detected")
-            if security_data["has_mint_function"]:
-                token_data["security_warnings"].append("Token has mint function enabled")
-            if security_data["has_proxy"]:
-                token_data["security_warnings"].append("Contract may have proxy capabilities")
-            if security_data["has_suspicious_holders"]:
-                token_data["security_warnings"].append("Suspicious holder concentration detected")
-        
-        return token_data, performance_data, security_data
-    
-    def check_new_listings(self):
-        """Check for new listings on Dexscanner"""
-        logger.info("Checking for new listings...")
-        
-        # Get new listings
-        listings = self.api.get_new_listings()
-        if not listings or "data" not in listings:
-            logger.warning("No data received from API or invalid response")
-            return
-        
-        # Process each listing
-        for token in listings.get("data", []):
-            token_id = token.get("id")
-            
-            # Skip if already processed or in DB
-            if token_id in self.processed_tokens or self.db.token_exists(token_id):
-                continue
-            
-            # Get token details
-            token_details = self.api.get_token_details(token_id)
-            if not token_details or "data" not in token_details:
-                continue
-            
-            # Parse token data
-            parsed_data = self.parse_token_details(token, token_details.get("data"))
-            if not parsed_data:
-                continue
-            
-            token_data, performance_data, security_data = parsed_data
-            
-            # Add to processed tokens
-            self.processed_tokens.add(token_id)
-            
-            # Save to database
-            self.db.add_token(token_data)
-            self.db.update_token_performance(token_id, performance_data)
-            self.db.update_security_check(token_id, security_data)
-            
-            # Send notification
-            message = self.notifier.format_token_message(token_data)
-            self.notifier.send_message(message)
-            
-            logger.info(f"New token detected and notified: {token_data['pair_name']}")
-    
-    def monitor_performance(self):
-        """Monitor performance of previously detected tokens"""
-        tokens = self.db.get_tokens_for_performance_check()
-        now = datetime.now()
-        
-        for token in tokens:
-            token_id = token["id"]
-            detected_time = datetime.fromisoformat(token["detected_at"])
-            hours_since_detection = (now - detected_time).total_seconds() / 3600
-            
-            # Get token details for update
-            token_details = self.api.get_token_details(token_id)
-            if not token_details or "data" not in token_details:
-                continue
-            
-            # Parse token data for performance update
-            parsed_data = self.parse_token_details(
-                {"id": token_id, "name": token["pair_name"]}, 
-                token_details.get("data")
-            )
-            
-            if not parsed_data:
-                continue
-            
-            _, performance_data, _ = parsed_data
-            
-            # Update performance in DB
-            self.db.update_token_performance(token_id, performance_data)
-            
-            # Check if we should send performance update
-            for interval in PERFORMANCE_INTERVALS:
-                # If the time since detection matches an interval (+/- 10 minutes)
-                if abs(hours_since_detection - interval) < 0.17:  # ~10 minutes
-                    history = self.db.get_token_performance_history(token_id, hours=interval)
-                    if history and len(history) >= 2:
-                        message = self.notifier.format_performance_update(token, history)
-                        self.notifier.send_message(message)
-                        logger.info(f"Sent {interval}h performance update for {token['pair_name']}")
-                    break
-    
-    def run(self):
-        """Main monitoring loop"""
-        logger.info("Starting Dexscanner monitor...")
-        
-        # Create and start performance monitoring thread
-        performance_thread = threading.Thread(target=self._performance_monitor_loop)
-        performance_thread.daemon = True
-        performance_thread.start()
-        
-        # Main loop for checking new listings
-        while True:
-            try:
-                self.check_new_listings()
-                time.sleep(CHECK_INTERVAL)
-            except Exception as e:
-                logger.error(f"Error in monitoring loop: {e}")
-                time.sleep(CHECK_INTERVAL * 2)  # Wait longer on error
-    
-    def _performance_monitor_loop(self):
-        """Separate loop for performance monitoring"""
-        while True:
-            try:
-                self.monitor_performance()
-                time.sleep(60 * 15)  # Check every 15 minutes
-            except Exception as e:
-                logger.error(f"Error in performance monitoring loop: {e}")
-                time.sleep(60 * 30)  # Wait longer on error
-    
-    def _format_age(self, timestamp):
-        """Format timestamp into readable age"""
-        if not timestamp:
-            return "Unknown"
-        
-        try:
-            created_time = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
-            now = datetime.now().astimezone()
-            delta = now - created_time
-            
-            if delta.days > 0:
-                return f"{delta.days}d {delta.seconds // 3600}h"
-            elif delta.seconds // 3600 > 0:
-                return f"{delta.seconds // 3600}h {(delta.seconds % 3600) // 60}m"
-            else:
-                return f"{(delta.seconds % 3600) // 60}m"
-        except Exception:
-            return "Unknown"
-    
-    def _format_number(self, number, decimals=1):
-        """Format number with K, M, B suffixes"""
-        if number is None:
-            return "0"
-        
-        try:
-            number = float(number)
-            if number < 1000:
-                return f"{number:.{decimals}f}"
-            elif number < 1000000:
-                return f"{number/1000:.{decimals}f}K"
-            elif number < 1000000000:
-                return f"{number/1000000:.{decimals}f}M"
-            else:
-                return f"{number/1000000000:.{decimals}f}B"
-        except:
-            return "0"
-    
-    def _calculate_percentage(self, part, whole):
-        """Calculate percentage"""
-        try:
-            if whole == 0:
-                return 0
-            return round((part / whole) * 100)
-        except:
-            return 0
-    
-    def _calculate_multiplier(self, current, reference):
-        """Calculate multiplier (e.g., ATH multiplier)"""
-        try:
-            if reference == 0:
-                return "1x"
-            multiplier = current / reference
-            return f"{multiplier:.1f}x"
-        except:
-            return "1x"
-
-
-# Entry point
-if __name__ == "__main__":
-    monitor = DexscannerMonitor()
-    monitor.check_new_listings()
-    # Check if environment variables are set
-    if not TELEGRAM_BOT_TOKEN or not TELEGRAM_CHAT_ID:
-        logger.error("TELEGRAM_BOT_TOKEN or TELEGRAM_CHAT_ID not set in environment variables")
-        print("Please create a .env file with TELEGRAM_BOT_TOKEN and TELEGRAM_CHAT_ID")
-        exit(1)
-    
-    # Start the monitor
-    monitor = DexscannerMonitor()
-    monitor.run()
+import aiohttp
+import asyncio
+import time
+import sqlite3
+import logging
+import orjson
+import os
+import queue
+import random
+from contextlib import contextmanager
+from datetime import datetime
+from dotenv import load_dotenv
+from functools import lru_cache
+
+# Load environment variables
+load_dotenv()
+
+# Configuration
+TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
+TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
+CHECK_INTERVAL = 15  # seconds
+MAX_CHECK_INTERVAL = 120  # seconds, cap for idle backoff
+PERFORMANCE_INTERVALS = [1, 6, 24]  # hours
+DB_PATH = "dexscanner_monitor.db"
+LOG_FILE = "dexscanner_monitor.log"
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    handlers=[
+        logging.FileHandler(LOG_FILE),
+        logging.StreamHandler()
+    ]
+)
+logger = logging.getLogger("DexscannerMonitor")
+
+class ConnectionPool:
+    """Small pool of pre-opened SQLite connections shared across threads.
+
+    With WAL mode, readers on one connection don't block the writer on
+    another, so the main and performance threads no longer serialize on a
+    single connection mutex.
+    """
+
+    def __init__(self, db_path, size=4):
+        self.db_path = db_path
+        self._connections = queue.Queue(maxsize=size)
+        for _ in range(size):
+            self._connections.put(self._open_connection())
+
+    def _open_connection(self):
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-20000")
+        # Map the database file so hot index pages stay resident (256MB)
+        conn.execute("PRAGMA mmap_size=268435456")
+        # Writers still serialize inside SQLite; wait instead of failing
+        # when two connections try to write at once.
+        conn.execute("PRAGMA busy_timeout=5000")
+        return conn
+
+    @contextmanager
+    def acquire(self):
+        conn = self._connections.get()
+        try:
+            yield conn
+        finally:
+            self._connections.put(conn)
+
+
+class Database:
+    # SQL for the hot-path statements, defined once so every call binds
+    # parameters against the same prepared-statement cache entry instead of
+    # hashing a freshly built string.
+    _INSERT_TOKEN_SQL = '''
+    INSERT OR IGNORE INTO tokens (
+        id, pair_name, deployer, owner_renounced, launch_time,
+        mint_enabled, liq_burned, chain, initial_mc, initial_liq,
+        website, source, detected_at, is_safe
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    '''
+
+    # OR IGNORE: timestamps have second precision, so two samples for the
+    # same token in the same second collide on the (id, timestamp) primary
+    # key; dropping the duplicate beats aborting the whole batch.
+    _INSERT_PERF_SQL = '''
+    INSERT OR IGNORE INTO token_performance (
+        id, timestamp, price, market_cap, volume_24h, holders
+    ) VALUES (?, ?, ?, ?, ?, ?)
+    '''
+
+    _UPSERT_SECURITY_SQL = '''
+    INSERT INTO security_checks (
+        id, has_honey_pot, has_mint_function, has_proxy,
+        has_suspicious_holders, check_time
+    ) VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT(id) DO UPDATE SET
+        has_honey_pot = excluded.has_honey_pot,
+        has_mint_function = excluded.has_mint_function,
+        has_proxy = excluded.has_proxy,
+        has_suspicious_holders = excluded.has_suspicious_holders,
+        check_time = excluded.check_time
+    '''
+
+    _UPDATE_SAFETY_SQL = "UPDATE tokens SET is_safe = ? WHERE id = ?"
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.pool = ConnectionPool(db_path)
+        self._initialize_db()
+
+    # Bumped when the schema changes; _migrate upgrades older databases
+    _SCHEMA_VERSION = 1
+
+    def _initialize_db(self):
+        """Initialize database with required tables"""
+        with self.pool.acquire() as conn:
+            self._create_tables(conn)
+            self._migrate(conn)
+        logger.info("Database initialized successfully")
+
+    def _migrate(self, conn):
+        """One-shot migrations for databases created before a schema change"""
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= self._SCHEMA_VERSION:
+            return
+
+        conn.execute("BEGIN")
+        try:
+            if version < 1:
+                # 0 -> 1: timestamps moved from ISO-8601 TEXT (local time) to
+                # integer unix seconds; convert legacy rows in place so the
+                # integer range predicates and age arithmetic keep working
+                conn.execute('''
+                UPDATE tokens
+                SET detected_at = CAST(strftime('%s', detected_at, 'utc') AS INTEGER)
+                WHERE typeof(detected_at) = 'text'
+                ''')
+                conn.execute('''
+                UPDATE token_performance
+                SET timestamp = CAST(strftime('%s', timestamp, 'utc') AS INTEGER)
+                WHERE typeof(timestamp) = 'text'
+                ''')
+                conn.execute('''
+                UPDATE security_checks
+                SET check_time = CAST(strftime('%s', check_time, 'utc') AS INTEGER)
+                WHERE typeof(check_time) = 'text'
+                ''')
+
+            conn.execute(f"PRAGMA user_version = {self._SCHEMA_VERSION}")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        logger.info(f"Migrated database schema to version {self._SCHEMA_VERSION}")
+
+    def _create_tables(self, conn):
+        cursor = conn.cursor()
+        
+        # Table for tracked tokens
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS tokens (
+            id TEXT PRIMARY KEY,
+            pair_name TEXT,
+            deployer TEXT,
+            owner_renounced INTEGER,
+            launch_time TIMESTAMP,
+            mint_enabled INTEGER,
+            liq_burned REAL,
+            chain TEXT,
+            initial_mc REAL,
+            initial_liq REAL,
+            website TEXT,
+            source TEXT,
+            detected_at INTEGER,
+            is_safe INTEGER DEFAULT 0
+        )
+        ''')
+        
+        # Table for token price performance
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS token_performance (
+            id TEXT,
+            timestamp INTEGER,
+            price REAL,
+            market_cap REAL,
+            volume_24h REAL,
+            holders INTEGER,
+            PRIMARY KEY (id, timestamp),
+            FOREIGN KEY (id) REFERENCES tokens(id)
+        )
+        ''')
+        
+        # Table for security checks
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS security_checks (
+            id TEXT PRIMARY KEY,
+            has_honey_pot INTEGER,
+            has_mint_function INTEGER,
+            has_proxy INTEGER,
+            has_suspicious_holders INTEGER,
+            check_time INTEGER,
+            FOREIGN KEY (id) REFERENCES tokens(id)
+        )
+        ''')
+
+        # Indexes for the hot query predicates: the performance-check scan
+        # over recent tokens and the per-token history range query
+        cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_tokens_detected ON tokens(detected_at)
+        ''')
+        cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_perf_id_ts ON token_performance(id, timestamp DESC)
+        ''')
+
+    def get_token_ids(self):
+        """Get the ids of all tracked tokens"""
+        with self.pool.acquire() as conn:
+            cursor = conn.execute("SELECT id FROM tokens")
+            return {row[0] for row in cursor.fetchall()}
+
+    def add_token(self, token_data):
+        """Add new token to database; returns True if the token was new"""
+        with self.pool.acquire() as conn:
+            cursor = conn.execute(self._INSERT_TOKEN_SQL, (
+                token_data["id"],
+                token_data["pair_name"],
+                token_data["deployer"],
+                1 if token_data["owner_renounced"] else 0,
+                token_data["launch_time"],
+                0 if token_data["mint_enabled"] == "No ✅" else 1,
+                token_data["liq_burned"],
+                token_data["chain"],
+                token_data["initial_mc"],
+                token_data["initial_liq"],
+                token_data["website"],
+                token_data["source"],
+                int(time.time()),
+                0
+            ))
+            # rowcount is 0 when INSERT OR IGNORE hit an existing row
+            inserted = cursor.rowcount > 0
+        if inserted:
+            logger.info(f"Added new token to database: {token_data['pair_name']}")
+        return inserted
+
+    def update_token_performance(self, token_id, performance_data):
+        """Update token performance metrics"""
+        with self.pool.acquire() as conn:
+            conn.execute(self._INSERT_PERF_SQL, (
+                token_id,
+                int(time.time()),
+                performance_data["price"],
+                performance_data["market_cap"],
+                performance_data["volume_24h"],
+                performance_data["holders"]
+            ))
+        logger.info(f"Updated performance data for token: {token_id}")
+
+    def update_token_performance_many(self, rows):
+        """Insert a batch of (id, timestamp, price, market_cap, volume_24h, holders)
+        performance rows in a single transaction"""
+        if not rows:
+            return
+
+        with self.pool.acquire() as conn:
+            conn.execute("BEGIN")
+            try:
+                conn.executemany(self._INSERT_PERF_SQL, rows)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        logger.info(f"Updated performance data for {len(rows)} tokens")
+
+    def update_security_check_many(self, checks):
+        """Update security check results for a batch of (token_id, security_data)
+        pairs in a single transaction"""
+        if not checks:
+            return
+
+        check_time = int(time.time())
+        security_rows = []
+        safety_rows = []
+        for token_id, security_data in checks:
+            security_rows.append((
+                token_id,
+                security_data["has_honey_pot"],
+                security_data["has_mint_function"],
+                security_data["has_proxy"],
+                security_data["has_suspicious_holders"],
+                check_time
+            ))
+            is_safe = not any([
+                security_data["has_honey_pot"],
+                security_data["has_mint_function"],
+                security_data["has_proxy"],
+                security_data["has_suspicious_holders"]
+            ])
+            safety_rows.append((1 if is_safe else 0, token_id))
+
+        with self.pool.acquire() as conn:
+            conn.execute("BEGIN")
+            try:
+                conn.executemany(self._UPSERT_SECURITY_SQL, security_rows)
+                conn.executemany(self._UPDATE_SAFETY_SQL, safety_rows)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        logger.info(f"Updated security checks for {len(checks)} tokens")
+
+    def update_security_check(self, token_id, security_data):
+        """Update security check results"""
+        # Update token safety status
+        is_safe = not any([
+            security_data["has_honey_pot"],
+            security_data["has_mint_function"],
+            security_data["has_proxy"],
+            security_data["has_suspicious_holders"]
+        ])
+
+        with self.pool.acquire() as conn:
+            # Both statements share one transaction, and so one fsync
+            conn.execute("BEGIN")
+            try:
+                conn.execute(self._UPSERT_SECURITY_SQL, (
+                    token_id,
+                    security_data["has_honey_pot"],
+                    security_data["has_mint_function"],
+                    security_data["has_proxy"],
+                    security_data["has_suspicious_holders"],
+                    int(time.time())
+                ))
+                conn.execute(self._UPDATE_SAFETY_SQL, (1 if is_safe else 0, token_id))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        logger.info(f"Updated security checks for token: {token_id}")
+
+    def purge_old_performance(self, days=8):
+        """Delete performance rows older than the monitoring window.
+
+        Tokens fall out of monitoring after 7 days; without a retention cap
+        token_performance grows unbounded and its index pages fall out of
+        the page cache.
+        """
+        time_threshold = int(time.time()) - days * 86400
+
+        with self.pool.acquire() as conn:
+            cursor = conn.execute(
+                "DELETE FROM token_performance WHERE timestamp < ?",
+                (time_threshold,)
+            )
+        if cursor.rowcount > 0:
+            logger.info(f"Purged {cursor.rowcount} old performance rows")
+
+    def vacuum(self):
+        """Reclaim free pages and defragment the database file"""
+        with self.pool.acquire() as conn:
+            conn.execute("VACUUM")
+        logger.info("Database vacuumed")
+
+    def get_perf_endpoints(self, token_id, hours=24):
+        """Get the oldest and newest performance rows in the window.
+
+        The interval notifications only compare the first and last data
+        points, so two index seeks replace reading the whole history.
+        """
+        time_threshold = int(time.time()) - hours * 3600
+
+        with self.pool.acquire() as conn:
+            first = conn.execute('''
+            SELECT timestamp, price, market_cap, volume_24h, holders
+            FROM token_performance
+            WHERE id = ? AND timestamp >= ?
+            ORDER BY timestamp ASC LIMIT 1
+            ''', (token_id, time_threshold)).fetchone()
+
+            last = conn.execute('''
+            SELECT timestamp, price, market_cap, volume_24h, holders
+            FROM token_performance
+            WHERE id = ? AND timestamp >= ?
+            ORDER BY timestamp DESC LIMIT 1
+            ''', (token_id, time_threshold)).fetchone()
+
+        if not first or not last or first[0] == last[0]:
+            return None
+
+        return [
+            {
+                "timestamp": row[0],
+                "price": row[1],
+                "market_cap": row[2],
+                "volume_24h": row[3],
+                "holders": row[4]
+            }
+            for row in (first, last)
+        ]
+
+    def get_tokens_for_performance_check(self):
+        """Get tokens that need performance monitoring"""
+        # Get tokens detected in the past week
+        time_threshold = int(time.time()) - 7 * 86400
+
+        with self.pool.acquire() as conn:
+            cursor = conn.execute('''
+            SELECT id, pair_name, detected_at
+            FROM tokens
+            WHERE detected_at >= ?
+            ''', (time_threshold,))
+
+            results = cursor.fetchall()
+
+        tokens = []
+        for row in results:
+            tokens.append({
+                "id": row[0],
+                "pair_name": row[1],
+                "detected_at": row[2]
+            })
+        
+        return tokens
+
+
+# Sentinel for conditional GETs answered with 304 Not Modified
+_NOT_MODIFIED = object()
+
+
+class DexscannerAPI:
+    def __init__(self):
+        self.base_url = "https://api.dexscanner.io"
+        self.headers = {
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+            "Accept": "application/json"
+        }
+        self._session = None
+        # Conditional-GET state for the listings endpoint
+        self._listings_etag = None
+        self._listings_last_modified = None
+        self._listings_cache = None
+
+    async def _get_session(self):
+        # Created lazily so the session binds to the running event loop;
+        # keep-alive pooling amortizes the TCP + TLS handshake across calls.
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=16, limit_per_host=8)
+            self._session = aiohttp.ClientSession(headers=self.headers, connector=connector)
+        return self._session
+
+    async def _get_json(self, url, timeout, max_retries=3, headers=None):
+        """GET a JSON document, retrying timeouts with backoff.
+
+        Returns a (payload, response_headers) pair so concurrent requests
+        can't clobber each other's headers through shared state.
+        """
+        session = await self._get_session()
+        retries = 0
+        while True:
+            try:
+                async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                    if response.status == 304:
+                        return _NOT_MODIFIED, response.headers
+                    response.raise_for_status()
+                    # orjson decodes straight from bytes, skipping both the
+                    # UTF-8 text decode and the slower stdlib parser
+                    return orjson.loads(await response.read()), response.headers
+            except asyncio.TimeoutError:
+                retries += 1
+                if retries >= max_retries:
+                    logger.error(f"Timed out fetching {url} after {max_retries} attempts")
+                    return None, None
+                wait_time = 2 ** retries  # Exponential backoff
+                logger.warning(f"Timeout fetching {url} (attempt {retries}/{max_retries}). Retrying in {wait_time} seconds")
+                await asyncio.sleep(wait_time)
+            except aiohttp.ClientError as e:
+                logger.error(f"Error fetching {url}: {e}")
+                return None, None
+            except orjson.JSONDecodeError as e:
+                # A malformed body is one failed request, not a reason to
+                # abort the whole gather batch
+                logger.error(f"Invalid JSON from {url}: {e}")
+                return None, None
+
+    async def get_new_listings(self, chain="sol", timeout=20):
+        """Get new listings from Dexscanner API"""
+        url = f"{self.base_url}/v1/{chain}/dex/pairs/new"
+        logger.info(f"Fetching new listings from {url}")
+
+        # Ask the server to skip the body when nothing changed since the
+        # last poll
+        headers = {}
+        if self._listings_etag:
+            headers["If-None-Match"] = self._listings_etag
+        if self._listings_last_modified:
+            headers["If-Modified-Since"] = self._listings_last_modified
+
+        result, response_headers = await self._get_json(url, timeout, headers=headers or None)
+        if result is _NOT_MODIFIED:
+            # 304: reuse the cached payload without re-downloading or
+            # re-parsing it
+            return self._listings_cache
+
+        if result is not None:
+            self._listings_etag = response_headers.get("ETag")
+            self._listings_last_modified = response_headers.get("Last-Modified")
+            self._listings_cache = result
+        return result
+
+    async def get_token_details(self, token_id, chain="sol", timeout=10):
+        """Get detailed information about a token"""
+        url = f"{self.base_url}/v1/{chain}/dex/pairs/{token_id}"
+        result, _ = await self._get_json(url, timeout)
+        return result
+
+class SecurityValidator:
+    @staticmethod
+    def validate_token(token_details):
+        """Validate token for potential security issues"""
+        security_data = {
+            "has_honey_pot": False,
+            "has_mint_function": False,
+            "has_proxy": False,
+            "has_suspicious_holders": False
+        }
+        
+        # Check for mint function; the API reports this directly, so look at
+        # the field instead of scanning a stringified copy of the whole dict
+        if token_details.get("mintEnabled") is True:
+            security_data["has_mint_function"] = True
+
+        # Check for suspicious holder concentration (if top 10 holders have more than 80%)
+        if "holders" in token_details and "top10" in token_details["holders"]:
+            top10_percentage = float(token_details["holders"]["top10"].replace("%", ""))
+            if top10_percentage > 80:
+                security_data["has_suspicious_holders"] = True
+        
+        # Additional security checks can be implemented here
+        # These would typically require contract analysis which might need integration
+        # with specialized APIs or services
+        
+        return security_data
+
+
+class TelegramNotifier:
+    def __init__(self, token, chat_id):
+        self.token = token
+        self.chat_id = chat_id
+        self.base_url = f"https://api.telegram.org/bot{token}"
+        self._session = None
+
+    async def _get_session(self):
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession()
+        return self._session
+
+    async def send_message(self, message, parse_mode="Markdown"):
+        """Send message to Telegram chat"""
+        try:
+            url = f"{self.base_url}/sendMessage"
+            payload = {
+                "chat_id": self.chat_id,
+                "text": message,
+                "parse_mode": parse_mode
+            }
+            session = await self._get_session()
+            async with session.post(url, json=payload) as response:
+                response.raise_for_status()
+            return True
+        except aiohttp.ClientError as e:
+            logger.error(f"Error sending Telegram message: {e}")
+            return False
+    
+    def format_token_message(self, token_data):
+        """Format token data into readable message for Telegram"""
+        # One f-string template builds the whole message in a single buffer
+        # instead of concatenating per-line temporaries
+        t = token_data
+        message = f"""📌 Pair: {t['pair_name']}
+👨‍💻 Deployer: {t['deployer']}
+👤 Owner: {'RENOUNCED' if t['owner_renounced'] else 'NOT RENOUNCED'}
+🔸 Chain: {t['chain']} | ⚖️ Age: {t['age']}
+🌿 Mint: {t['mint_enabled']} | Liq: 🔥 ({t['liq_burned']}%)
+💰 MC: ${t['market_cap']} | Liq: ${t['liquidity']} ({t['liq_percentage']}%)
+📈 24h: {t['price_change_24h']}% | V: ${t['volume_24h']} | B:{t['buys']} S:{t['sells']}
+💲 Price: ${t['price']}
+💵 Launch MC: ${t['launch_mc']} ({t['launch_mc_multiplier']}x)
+👆 ATH: ${t['ath']} ({t['ath_multiplier']}x)
+🔗 Website ({t['source_link']})
+📊 TS: {t['transaction_count']}
+👩‍👧‍👦 Holders: {t['holders_count']} | Top10: {t['top10_percentage']}%
+💸 Airdrops: {t['airdrops']} for a total of {t['airdrops_percentage']}%
+🥡 Block 0 Snipes: {t['block0_snipes_percentage']}% | {t['block0_snipes_amount']} SOL
+👶🏽 Fresh Wallets: {t['fresh_wallets']} | {t['fresh_wallets_percentage']}% Time
+💵 TEAM WALLETS {t['team_wallets_percentage']}% | {t['team_wallets_amount']} SOL
+Deployer {t['deployer_amount']} SOL | {t['deployer_percentage']}% Time"""
+
+        # Add security warnings if applicable
+        warnings = token_data.get("security_warnings")
+        if warnings:
+            warning_lines = "\n".join(f"- {warning}" for warning in warnings)
+            message += f"\n\n⚠️ SECURITY WARNINGS ⚠️\n{warning_lines}\n"
+
+        return message
+    
+    def format_performance_update(self, token_data, performance_data):
+        """Format performance update for a token"""
+        # Calculate price changes
+        first_price = performance_data[0]["price"] if performance_data else 0
+        current_price = performance_data[-1]["price"] if performance_data else 0
+        price_change = ((current_price - first_price) / first_price * 100) if first_price > 0 else 0
+        
+        message = (
+            f"📊 PERFORMANCE UPDATE 📊\n"
+            f"📌 Pair: {token_data['pair_name']}\n"
+            f"💲 Current Price: ${current_price:.8f}\n"
+            f"📈 Price Change: {price_change:.2f}%\n"
+            f"💰 Current MC: ${performance_data[-1]['market_cap']}\n"
+            f"👥 Holders: {performance_data[-1]['holders']}\n"
+            f"🔄 24h Volume: ${performance_data[-1]['volume_24h']}\n"
+            f"⏰ Monitored since: {datetime.fromtimestamp(token_data['detected_at']).isoformat()}\n"
+        )
+        
+        return message
+
+
+@lru_cache(maxsize=4096)
+def _format_number_cached(number, decimals):
+    """Format number with K, M, B suffixes"""
+    # Module-level and cached: the same values (0, small counts) recur
+    # constantly across tokens, so most calls are a dict lookup.
+    if number is None:
+        return "0"
+
+    try:
+        number = float(number)
+        if number < 1000:
+            return f"{number:.{decimals}f}"
+        elif number < 1000000:
+            return f"{number/1000:.{decimals}f}K"
+        elif number < 1000000000:
+            return f"{number/1000000:.{decimals}f}M"
+        else:
+            return f"{number/1000000000:.{decimals}f}B"
+    except:
+        return "0"
+
+
+def _format_number(number, decimals=1):
+    """Format number with K, M, B suffixes"""
+    try:
+        return _format_number_cached(number, decimals)
+    except TypeError:
+        # lru_cache hashes the argument before the formatter's own fallback
+        # can run; an unhashable API value still formats as "0"
+        return "0"
+
+
+class DexscannerMonitor:
+    def __init__(self):
+        self.db = Database(DB_PATH)
+        self.api = DexscannerAPI()
+        self.validator = SecurityValidator()
+        self.notifier = TelegramNotifier(TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID)
+        self.last_check_time = datetime.now()
+        # Seed with the ids already in the database so membership checks are
+        # a Python set lookup instead of a SELECT per listing per cycle.
+        self.processed_tokens = self.db.get_token_ids()
+        self._last_listings_hash = None
+        self._last_purge = time.time()
+        self._last_vacuum = time.time()
+    
+    def parse_token_details(self, token_raw, details_raw=None):
+        """Parse token details from API response"""
+        if not details_raw:
+            details_raw = {}
+
+        # Check if this is from pump.fun or pump.swap
+        source = None
+        name = token_raw.get("name", "")
+        name_lower = name.lower()
+        if "pump.fun" in name_lower:
+            source = "pump.fun"
+        elif "pump.swap" in name_lower:
+            source = "pump.swap"
+
+        # If not from our target sources, return None
+        if not source:
+            return None
+
+        # Bind the lookups and shared fields once; the dicts below reference
+        # these locals instead of repeating 30+ .get calls
+        tg = token_raw.get
+        dg = details_raw.get
+        market_cap = tg("marketCap", 0)
+        liquidity = tg("liquidity", 0)
+        price = tg("price", 0)
+        volume_24h = tg("volume24h", 0)
+        launch_mc = dg("launchMarketCap", 0)
+        ath_mc = dg("athMarketCap", 0)
+        holders_count = dg("holdersCount", 0)
+        source_link = f"https://{source}"
+
+        # Parse the launch timestamp once; age and storage both use the int
+        launch_ts = self._parse_timestamp(tg("createdAt"))
+
+        # Basic details
+        token_data = {
+            "id": tg("id", ""),
+            "pair_name": name or "Unknown",
+            "deployer": dg("deployer", "Unknown"),
+            "owner_renounced": dg("ownerRenounced", False),
+            "chain": "SOL",
+            "age": self._format_age(launch_ts),
+            "launch_time": launch_ts,
+            "mint_enabled": "No ✅" if not dg("mintEnabled", True) else "Yes ⚠️",
+            "liq_burned": dg("liquidityBurned", 0),
+            "market_cap": _format_number(market_cap),
+            "liquidity": _format_number(liquidity),
+            "liq_percentage": self._calculate_percentage(liquidity, market_cap),
+            "price": _format_number(price, 8),
+            "price_change_24h": tg("priceChange24h", 0),
+            "volume_24h": _format_number(volume_24h),
+            "buys": dg("buys24h", 0),
+            "sells": dg("sells24h", 0),
+            "launch_mc": _format_number(launch_mc),
+            "launch_mc_multiplier": self._calculate_multiplier(market_cap, launch_mc),
+            "ath": _format_number(ath_mc),
+            "ath_multiplier": self._calculate_multiplier(ath_mc, market_cap),
+            "source": source,
+            "source_link": source_link,
+            "transaction_count": dg("transactionCount", 0),
+            "holders_count": holders_count,
+            "top10_percentage": dg("top10HoldersPercentage", 0),
+            "airdrops": dg("airdropsCount", 0),
+            "airdrops_percentage": dg("airdropsPercentage", 0),
+            "block0_snipes_percentage": dg("block0SnipesPercentage", 0),
+            "block0_snipes_amount": dg("block0SnipesAmount", 0),
+            "fresh_wallets": dg("freshWalletsCount", 0),
+            "fresh_wallets_percentage": dg("freshWalletsPercentage", 0),
+            "team_wallets_percentage": dg("teamWalletsPercentage", 0),
+            "team_wallets_amount": dg("teamWalletsAmount", 0),
+            "deployer_amount": dg("deployerAmount", 0),
+            "deployer_percentage": dg("deployerPercentage", 0),
+            "website": dg("website", source_link),
+            "initial_mc": market_cap,
+            "initial_liq": liquidity
+        }
+
+        # Extract performance data for DB
+        performance_data = {
+            "price": price,
+            "market_cap": market_cap,
+            "volume_24h": volume_24h,
+            "holders": holders_count
+        }
+        
+        # Run security validation
+        security_data = self.validator.validate_token(details_raw)
+        
+        # Add security warnings if any
+        if any(security_data.values()):
+            token_data["security_warnings"] = []
+            if security_data["has_honey_pot"]:
+                token_data["security_warnings"].append("Potential honeypot detected")
+            if security_data["has_mint_function"]:
+                token_data["security_warnings"].append("Token has mint function enabled")
+            if security_data["has_proxy"]:
+                token_data["security_warnings"].append("Contract may have proxy capabilities")
+            if security_data["has_suspicious_holders"]:
+                token_data["security_warnings"].append("Suspicious holder concentration detected")
+        
+        return token_data, performance_data, security_data
+    
+    async def check_new_listings(self):
+        """Check for new listings on Dexscanner"""
+        logger.info("Checking for new listings...")
+
+        # Get new listings
+        listings = await self.api.get_new_listings()
+        if not listings or "data" not in listings:
+            logger.warning("No data received from API or invalid response")
+            return False
+
+        # An unchanged payload means nothing new happened; tell the polling
+        # loop so it can back off
+        listings_hash = hash(orjson.dumps(listings["data"], option=orjson.OPT_SORT_KEYS, default=str))
+        if listings_hash == self._last_listings_hash:
+            return False
+
+        # Skip listings already processed (the set is seeded from the DB at startup)
+        new_tokens = [
+            token for token in listings.get("data", [])
+            if token.get("id") not in self.processed_tokens
+        ]
+        if not new_tokens:
+            self._last_listings_hash = listings_hash
+            return True
+
+        # Fetch details for the unseen listings concurrently
+        details = await asyncio.gather(
+            *(self.api.get_token_details(token.get("id")) for token in new_tokens)
+        )
+
+        fetch_failed = False
+        for token, token_details in zip(new_tokens, details):
+            token_id = token.get("id")
+
+            if not token_details or "data" not in token_details:
+                # Leave the hash unrecorded so the next cycle retries this
+                # token instead of short-circuiting on an identical payload
+                fetch_failed = True
+                continue
+
+            # Parse token data
+            parsed_data = self.parse_token_details(token, token_details.get("data"))
+            if not parsed_data:
+                continue
+
+            token_data, performance_data, security_data = parsed_data
+
+            # Add to processed tokens
+            self.processed_tokens.add(token_id)
+
+            # Save to database; the insert doubles as the duplicate check,
+            # so only a genuinely new row triggers a notification
+            if not self.db.add_token(token_data):
+                continue
+            self.db.update_token_performance(token_id, performance_data)
+            self.db.update_security_check(token_id, security_data)
+
+            # Send notification
+            message = self.notifier.format_token_message(token_data)
+            await self.notifier.send_message(message)
+
+            logger.info(f"New token detected and notified: {token_data['pair_name']}")
+
+        # Record the hash only once the whole batch succeeded; a mid-batch
+        # exception also leaves it unset, so the cycle is retried
+        if not fetch_failed:
+            self._last_listings_hash = listings_hash
+
+        return True
+
+    async def monitor_performance(self):
+        """Monitor performance of previously detected tokens"""
+        tokens = self.db.get_tokens_for_performance_check()
+        if not tokens:
+            return False
+
+        now_ts = int(time.time())
+
+        # Accumulate rows during the loop and flush them in one transaction
+        # each, so the batch shares a single commit/fsync instead of one per
+        # token.
+        performance_rows = []
+        security_checks = []
+        due_updates = []
+
+        # Fetch details for all monitored tokens concurrently; DB writes
+        # happen via the batched flush below.
+        details = await asyncio.gather(
+            *(self.api.get_token_details(token["id"]) for token in tokens)
+        )
+
+        for token, token_details in zip(tokens, details):
+            token_id = token["id"]
+            # detected_at is already epoch seconds, so the age is a plain
+            # integer subtraction with no datetime objects
+            seconds_since_detection = now_ts - token["detected_at"]
+
+            if not token_details or "data" not in token_details:
+                continue
+            
+            # Parse token data for performance update
+            parsed_data = self.parse_token_details(
+                {"id": token_id, "name": token["pair_name"]}, 
+                token_details.get("data")
+            )
+            
+            if not parsed_data:
+                continue
+            
+            _, performance_data, security_data = parsed_data
+
+            performance_rows.append((
+                token_id,
+                now_ts,
+                performance_data["price"],
+                performance_data["market_cap"],
+                performance_data["volume_24h"],
+                performance_data["holders"]
+            ))
+            security_checks.append((token_id, security_data))
+
+            # Check if we should send performance update
+            for interval in PERFORMANCE_INTERVALS:
+                # If the time since detection matches an interval (+/- 10 minutes)
+                if abs(seconds_since_detection - interval * 3600) < 600:
+                    due_updates.append((token, interval))
+                    break
+
+        # Flush the batches before sending updates so the history queries
+        # below see this cycle's data points.
+        self.db.update_token_performance_many(performance_rows)
+        self.db.update_security_check_many(security_checks)
+
+        for token, interval in due_updates:
+            history = self.db.get_perf_endpoints(token["id"], hours=interval)
+            if history:
+                message = self.notifier.format_performance_update(token, history)
+                await self.notifier.send_message(message)
+                logger.info(f"Sent {interval}h performance update for {token['pair_name']}")
+
+        return True
+
+    async def run(self):
+        """Run both monitoring loops on the event loop"""
+        logger.info("Starting Dexscanner monitor...")
+        await asyncio.gather(
+            self._listings_loop(),
+            self._performance_monitor_loop()
+        )
+
+    async def _listings_loop(self):
+        """Main loop for checking new listings"""
+        interval = CHECK_INTERVAL
+        while True:
+            try:
+                changed = await self.check_new_listings()
+                if changed:
+                    interval = CHECK_INTERVAL
+                else:
+                    # Nothing changed; back off up to the cap
+                    interval = min(interval * 2, MAX_CHECK_INTERVAL)
+                # Jitter so multiple instances don't poll in lockstep
+                await asyncio.sleep(interval * random.uniform(0.8, 1.2))
+            except Exception as e:
+                logger.error(f"Error in monitoring loop: {e}")
+                await asyncio.sleep(CHECK_INTERVAL * 2)  # Wait longer on error
+
+    async def _performance_monitor_loop(self):
+        """Separate loop for performance monitoring"""
+        interval = 60 * 15  # Check every 15 minutes
+        while True:
+            try:
+                active = await self.monitor_performance()
+
+                # Housekeeping: hourly retention purge, weekly vacuum
+                now_ts = time.time()
+                if now_ts - self._last_purge >= 3600:
+                    self.db.purge_old_performance()
+                    self._last_purge = now_ts
+                if now_ts - self._last_vacuum >= 7 * 86400:
+                    await asyncio.to_thread(self.db.vacuum)
+                    self._last_vacuum = now_ts
+                if active:
+                    interval = 60 * 15
+                else:
+                    # No tokens in the monitoring window; back off
+                    interval = min(interval * 2, 60 * 60)
+                await asyncio.sleep(interval * random.uniform(0.8, 1.2))
+            except Exception as e:
+                logger.error(f"Error in performance monitoring loop: {e}")
+                await asyncio.sleep(60 * 30)  # Wait longer on error
+    
+    def _parse_timestamp(self, timestamp):
+        """Parse an ISO-8601 API timestamp into unix seconds"""
+        if not timestamp:
+            return None
+
+        try:
+            return int(datetime.fromisoformat(timestamp.replace("Z", "+00:00")).timestamp())
+        except Exception:
+            return None
+
+    def _format_age(self, launch_ts):
+        """Format a unix launch timestamp into readable age"""
+        if not launch_ts:
+            return "Unknown"
+
+        # Pure integer arithmetic; the ISO string was already parsed once
+        # in parse_token_details
+        delta = max(int(time.time()) - launch_ts, 0)
+        days, rem = divmod(delta, 86400)
+        hours, rem = divmod(rem, 3600)
+        minutes = rem // 60
+
+        if days > 0:
+            return f"{days}d {hours}h"
+        elif hours > 0:
+            return f"{hours}h {minutes}m"
+        else:
+            return f"{minutes}m"
+    
+    def _calculate_percentage(self, part, whole):
+        """Calculate percentage"""
+        try:
+            if whole == 0:
+                return 0
+            return round((part / whole) * 100)
+        except:
+            return 0
+    
+    def _calculate_multiplier(self, current, reference):
+        """Calculate multiplier (e.g., ATH multiplier)"""
+        try:
+            if reference == 0:
+                return "1x"
+            multiplier = current / reference
+            return f"{multiplier:.1f}x"
+        except:
+            return "1x"
+
+
+# Entry point
+if __name__ == "__main__":
+    # Check if environment variables are set
+    if not TELEGRAM_BOT_TOKEN or not TELEGRAM_CHAT_ID:
+        logger.error("TELEGRAM_BOT_TOKEN or TELEGRAM_CHAT_ID not set in environment variables")
+        print("Please create a .env file with TELEGRAM_BOT_TOKEN and TELEGRAM_CHAT_ID")
+        exit(1)
+
+    # Start the monitor
+    monitor = DexscannerMonitor()
+    asyncio.run(monitor.run())